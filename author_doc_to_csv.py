@@ -1,18 +1,44 @@
 import re
 import csv
 import zipfile
-import xml.etree.ElementTree as ET
 import argparse
 import sys
 import os
 
+# Prefer lxml's C-backed parser when available; fall back to the stdlib.
+try:
+    from lxml import etree as ET
+    HAVE_LXML = True
+except ImportError:
+    import xml.etree.ElementTree as ET
+    HAVE_LXML = False
+
+# WordprocessingML namespace-qualified tags for paragraphs and text nodes
+W_URI = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+P_TAG = '{' + W_URI + '}p'
+T_TAG = '{' + W_URI + '}t'
+
+# Section divider: a line containing only 'Affiliations' (any case)
+_SPLIT_RE = re.compile(r'(?im)^\s*affiliations\s*$')
+
+# Affiliation line: Start of line -> (Digits) -> whitespace -> (Rest of text)
+_AFF_RE = re.compile(r'^(\d+)\s*(.*)')
+
+# Author entry: Match non-digits (name) followed by digits (affiliation IDs)
+# This handles accents/utf-8 characters correctly.
+_AUTHOR_RE = re.compile(r'([^\d]+?)(\d[\d,]*)')
+
+# Output files are written through a large buffer to cut down on write() syscalls
+OUTPUT_BUFFER_SIZE = 1 << 20
+
 
 # ==========================================
 # DOCX TEXT EXTRACTOR
 # ==========================================
 def get_text_from_docx(filename):
     """
-    Extracts text from a .docx file (zipped XML) without external dependencies.
+    Extracts text from a .docx file (zipped XML).
+    Uses lxml if installed, otherwise the standard library parser.
     """
     if not os.path.exists(filename):
         print(f"Error: The file '{filename}' was not found.")
@@ -21,24 +47,36 @@ def get_text_from_docx(filename):
     try:
         with zipfile.ZipFile(filename) as docx:
             # content is in word/document.xml
-            xml_content = docx.read('word/document.xml')
-
-            # Parse XML
-            tree = ET.fromstring(xml_content)
-
             full_text = []
-
-            # Find all paragraphs (tag ending in 'p')
-            for p in tree.iter():
-                if p.tag.endswith('}p'):
-                    para_text = []
-                    # Find all text nodes (tag ending in 't')
-                    for t in p.iter():
-                        if t.tag.endswith('}t') and t.text:
-                            para_text.append(t.text)
-
+            full_text_append = full_text.append
+
+            # Stream the XML, handling each paragraph as soon as it closes
+            # and then clearing it so the full DOM is never held in memory.
+            with docx.open('word/document.xml') as stream:
+                if HAVE_LXML:
+                    # lxml can filter to paragraph elements natively. Never resolve
+                    # entities or hit the network, matching the stdlib parser
+                    # regardless of which lxml version is installed.
+                    events = ET.iterparse(stream, events=('end',), tag=P_TAG,
+                                          resolve_entities=False, no_network=True)
+                else:
+                    events = ET.iterparse(stream, events=('end',))
+
+                for _, elem in events:
+                    if elem.tag != P_TAG:
+                        continue
+
+                    para_text = "".join(t.text for t in elem.iter(T_TAG) if t.text)
                     if para_text:
-                        full_text.append("".join(para_text))
+                        full_text_append(para_text)
+
+                    if HAVE_LXML:
+                        elem.clear(keep_tail=True)
+                        # Also drop already-processed siblings from the tree
+                        while elem.getprevious() is not None:
+                            del elem.getparent()[0]
+                    else:
+                        elem.clear()
 
             return "\n".join(full_text)
 
@@ -58,69 +96,37 @@ def parse_data(full_text):
       1. The first non-empty line is a Title (and is skipped).
       2. The keyword 'Affiliations' separates the author list from the addresses.
     """
-    lines = full_text.split('\n')
-
-    author_lines = []
-    affiliation_lines = []
-
-    found_split = False
-    title_skipped = False
-
-    for line in lines:
-        clean_line = line.strip()
-        if not clean_line:
-            continue
-
-        # Case-insensitive check for the section divider
-        if clean_line.lower() == "affiliations":
-            found_split = True
-            continue
-
-        if not found_split:
-            # We are in the Author section.
+    # Case-insensitive split on the section divider line
+    parts = _SPLIT_RE.split(full_text, maxsplit=1)
+    authors_block = parts[0].lstrip()
+    affiliations_block = parts[1] if len(parts) > 1 else ''
 
-            # LOGIC CHANGE: Treat the first non-empty line found as the Title and skip it.
-            if not title_skipped:
-                title_skipped = True
-                continue
+    # Treat the first non-empty line found as the Title and skip it.
+    authors_block = authors_block.split('\n', 1)[1] if '\n' in authors_block else ''
 
-            author_lines.append(clean_line)
-        else:
-            # We are in the Affiliation section.
-            affiliation_lines.append(clean_line)
-
-    return "\n".join(author_lines), "\n".join(affiliation_lines)
+    return authors_block.strip(), affiliations_block.strip()
 
 
 def parse_affiliations_to_dict(text):
-    """Parses affiliation text into a dictionary of {id: affiliation_string}."""
-    affiliations = {}
-    lines = text.strip().split('\n')
-
-    for line in lines:
-        line = line.strip()
-        # Regex: Start of line -> (Digits) -> whitespace -> (Rest of text)
-        match = re.match(r'^(\d+)\s*(.*)', line)
-        if match:
-            aff_id = match.group(1)
-            aff_text = match.group(2)
-            affiliations[aff_id] = aff_text
-
-    return affiliations
+    """Parses affiliation text into a dictionary of {id (int): affiliation_string}."""
+    return {
+        int(match.group(1)): match.group(2)
+        for line in text.strip().split('\n')
+        if (match := _AFF_RE.match(line.strip()))
+    }
 
 
 def parse_authors_to_list(text):
-    """Parses author text into a list of dictionaries."""
+    """
+    Parses author text into a (last_names, first_names, affil_strs) tuple
+    of parallel lists.
+    """
     # Join lines to treat as a single stream
     clean_text = text.replace('\n', ' ').strip()
 
-    # Regex: Match non-digits (name) followed by digits (affiliation IDs)
-    # This handles accents/utf-8 characters correctly.
-    pattern = re.compile(r'([^\d]+?)(\d[\d,]*)')
-
-    authors = []
+    last_names, first_names, affil_strs = [], [], []
 
-    for match in pattern.finditer(clean_text):
+    for match in _AUTHOR_RE.finditer(clean_text):
         name_part = match.group(1).strip()
         affils_part = match.group(2).strip()
 
@@ -143,40 +149,23 @@ def parse_authors_to_list(text):
         # Clean up affiliation string
         affils_part = affils_part.strip(',')
 
-        authors.append({
-            'first_middle': first_middle,
-            'last_name': last_name,
-            'affiliations': affils_part
-        })
+        last_names.append(last_name)
+        first_names.append(first_middle)
+        affil_strs.append(affils_part)
 
-    return authors
+    return last_names, first_names, affil_strs
 
 
 # ==========================================
-# MAIN EXECUTION
+# PIPELINE STAGES
 # ==========================================
 
-def main():
-    parser = argparse.ArgumentParser(
-        description="Extract authors and affiliations from a DOCX file into structured CSVs.",
-        epilog="""
-OUTPUT FILES:
-  1. names.csv: [Last Name, First Name / Middle, Affiliation IDs]
-  2. affiliations.csv: [Affiliation ID, Affiliation Name]
-
-NOTE:
-  The script assumes the first non-empty line of the DOCX is a Title and skips it.
-""",
-        formatter_class=argparse.RawDescriptionHelpFormatter
-    )
-    parser.add_argument("input_file", help="Path to the input .docx file.")
-
-    args = parser.parse_args()
-
-    input_filename = args.input_file
-    names_output = "names.csv"
-    affiliations_output = "affiliations.csv"
-
+def extract(input_filename):
+    """
+    Reads a .docx author list and returns (authors, aff_dict), where authors
+    is a (last_names, first_names, affil_strs) tuple of parallel lists.
+    The affiliations dictionary is ordered by numeric affiliation ID.
+    """
     print(f"Reading file: {input_filename}...")
     full_text = get_text_from_docx(input_filename)
 
@@ -188,33 +177,62 @@ NOTE:
 
     # Process Affiliations
     aff_dict = parse_affiliations_to_dict(affiliations_text)
+    aff_dict = {aff_id: aff_dict[aff_id] for aff_id in sorted(aff_dict)}
 
     # Process Authors
-    author_list = parse_authors_to_list(authors_text)
-    print(f"Found {len(author_list)} authors and {len(aff_dict)} affiliations.")
+    authors = parse_authors_to_list(authors_text)
+    print(f"Found {len(authors[0])} authors and {len(aff_dict)} affiliations.")
+
+    return authors, aff_dict
+
 
+def write_csvs(authors, aff_dict, names_output, affiliations_output):
+    """Writes the names and affiliations CSV files."""
     # Write Affiliations CSV
     print(f"Writing {affiliations_output}...")
-    with open(affiliations_output, 'w', newline='', encoding='utf-8-sig') as f:
+    with open(affiliations_output, 'w', buffering=OUTPUT_BUFFER_SIZE, newline='', encoding='utf-8-sig') as f:
         writer = csv.writer(f)
         writer.writerow(['Affiliation ID', 'Affiliation Name'])
-        for aff_id in sorted(aff_dict.keys(), key=lambda x: int(x)):
-            writer.writerow([aff_id, aff_dict[aff_id]])
+        writer.writerows(aff_dict.items())
 
     # Write Names CSV
     print(f"Writing {names_output}...")
-    with open(names_output, 'w', newline='', encoding='utf-8-sig') as f:
+    with open(names_output, 'w', buffering=OUTPUT_BUFFER_SIZE, newline='', encoding='utf-8-sig') as f:
         writer = csv.writer(f)
         writer.writerow(['Last Name', 'First Name / Middle', 'Affiliation IDs'])
-        for auth in author_list:
-            writer.writerow([
-                auth['last_name'],
-                auth['first_middle'],
-                auth['affiliations']
-            ])
+        writer.writerows(zip(*authors))
 
+
+def run(input_filename, names_output="names.csv", affiliations_output="affiliations.csv"):
+    """Converts a .docx author list into names and affiliations CSV files."""
+    authors, aff_dict = extract(input_filename)
+    write_csvs(authors, aff_dict, names_output, affiliations_output)
     print("Conversion complete.")
 
 
+# ==========================================
+# MAIN EXECUTION
+# ==========================================
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Extract authors and affiliations from a DOCX file into structured CSVs.",
+        epilog="""
+OUTPUT FILES:
+  1. names.csv: [Last Name, First Name / Middle, Affiliation IDs]
+  2. affiliations.csv: [Affiliation ID, Affiliation Name]
+
+NOTE:
+  The script assumes the first non-empty line of the DOCX is a Title and skips it.
+""",
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("input_file", help="Path to the input .docx file.")
+
+    args = parser.parse_args()
+
+    run(args.input_file)
+
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
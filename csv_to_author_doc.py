@@ -10,7 +10,7 @@ from xml.sax.saxutils import escape
 # ==========================================
 
 # 1. [Content_Types].xml - Defines the file types inside the zip
-CONTENT_TYPES_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+CONTENT_TYPES_XML = b"""<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
 <Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
     <Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
     <Default Extension="xml" ContentType="application/xml"/>
@@ -18,17 +18,19 @@ CONTENT_TYPES_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
 </Types>"""
 
 # 2. _rels/.rels - Defines the relationship to the main document part
-RELS_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+RELS_XML = b"""<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
 <Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
     <Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="word/document.xml"/>
 </Relationships>"""
 
 # 3. word/document.xml (Header/Footer wrapper)
-# We will inject the body content into this template.
-DOCUMENT_XML_TEMPLATE = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+# The body content is streamed between this prefix and suffix.
+DOCUMENT_XML_PREFIX = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
 <w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">
     <w:body>
-        {body_content}
+        """
+
+DOCUMENT_XML_SUFFIX = """
         <w:sectPr>
             <w:pgSz w:w="12240" w:h="15840"/>
             <w:pgMar w:top="1440" w:right="1440" w:bottom="1440" w:left="1440" w:header="720" w:footer="720" w:gutter="0"/>
@@ -36,105 +38,144 @@ DOCUMENT_XML_TEMPLATE = """<?xml version="1.0" encoding="UTF-8" standalone="yes"
     </w:body>
 </w:document>"""
 
+# Precomputed XML fragments reused during document generation
+BOLD_PROPS = '<w:rPr><w:b/></w:rPr>'
+SUP_PROPS = '<w:rPr><w:vertAlign w:val="superscript"/></w:rPr>'
+BOLD_SUP_PROPS = '<w:rPr><w:b/><w:vertAlign w:val="superscript"/></w:rPr>'
+COMMA_RUN = '<w:r><w:t xml:space="preserve">, </w:t></w:r>'
+EMPTY_PARA = '<w:p/>'
+
+# Output files are written through a large buffer to cut down on write() syscalls
+OUTPUT_BUFFER_SIZE = 1 << 20
+
+# Deflate level for word/document.xml; level 1 gets most of the size win for little CPU
+DOCUMENT_COMPRESSLEVEL = 1
+
+# Generated XML is batched into pieces of roughly this many characters before
+# being encoded and compressed, rather than writing every small fragment
+DOCUMENT_WRITE_CHUNK_SIZE = 64 * 1024
+
 # ==========================================
 # HELPER FUNCTIONS
 # ==========================================
 
-def create_run_xml(text, superscription=False, bold=False):
-    """Creates a Word XML <w:r> (run) element containing text."""
-    props = ""
-    if superscription or bold:
-        props += "<w:rPr>"
-        if bold:
-            props += "<w:b/>"
-        if superscription:
-            props += "<w:vertAlign w:val=\"superscript\"/>"
-        props += "</w:rPr>"
-    
+def emit_run(parts, text, superscription=False, bold=False):
+    """Appends a Word XML <w:r> (run) element containing text to the parts list."""
+    # An empty run adds nothing to the document, so skip it
+    if not text:
+        return
+
+    parts.append("<w:r>")
+    if bold and superscription:
+        parts.append(BOLD_SUP_PROPS)
+    elif bold:
+        parts.append(BOLD_PROPS)
+    elif superscription:
+        parts.append(SUP_PROPS)
+
     # Escape special characters for XML validity (&, <, >)
-    safe_text = escape(text)
-    
-    return f"<w:r>{props}<w:t xml:space=\"preserve\">{safe_text}</w:t></w:r>"
+    parts.append("<w:t xml:space=\"preserve\">")
+    parts.append(escape(text))
+    parts.append("</w:t></w:r>")
 
-def create_paragraph_xml(runs):
-    """Creates a Word XML <w:p> (paragraph) element containing a list of run XML strings."""
-    return f"<w:p>{''.join(runs)}</w:p>"
+def emit_paragraph_open(parts):
+    """Appends the opening tag of a Word XML <w:p> (paragraph) element to the parts list."""
+    parts.append("<w:p>")
+
+def emit_paragraph_close(parts):
+    """Appends the closing tag of a Word XML <w:p> (paragraph) element to the parts list."""
+    parts.append("</w:p>")
 
 def read_csv_data(names_file, affiliations_file):
     """Reads the CSV inputs and returns structured lists/dicts."""
     
     # Read Affiliations
-    affiliations = {} # {id: name}
+    affiliations = {} # {id (int): name}
     try:
         with open(affiliations_file, 'r', encoding='utf-8') as f:
             reader = csv.reader(f)
             next(reader, None) # Skip header
             for row in reader:
                 if len(row) >= 2:
-                    aff_id, aff_name = row[0], row[1]
-                    affiliations[aff_id] = aff_name
+                    try:
+                        aff_id = int(row[0])
+                    except ValueError:
+                        print(f"Error: Affiliations file '{affiliations_file}' contains a non-numeric ID: '{row[0]}'")
+                        sys.exit(1)
+                    affiliations[aff_id] = row[1]
     except FileNotFoundError:
         print(f"Error: Affiliations file '{affiliations_file}' not found.")
         sys.exit(1)
 
-    # Read Names
-    authors = [] # list of dicts
+    # Read Names into parallel lists (last, first, affiliation IDs)
+    last_names, first_names, affil_strs = [], [], []
     try:
         with open(names_file, 'r', encoding='utf-8') as f:
             reader = csv.reader(f)
             next(reader, None) # Skip header
             for row in reader:
                 if len(row) >= 3:
-                    authors.append({
-                        'last': row[0],
-                        'first': row[1],
-                        'affils': row[2]
-                    })
+                    last_names.append(row[0])
+                    first_names.append(row[1])
+                    affil_strs.append(row[2])
     except FileNotFoundError:
         print(f"Error: Names file '{names_file}' not found.")
         sys.exit(1)
         
-    return authors, affiliations
+    return (last_names, first_names, affil_strs), affiliations
 
 def generate_document_xml(authors, affiliations):
-    """Generates the content for word/document.xml."""
-    
+    """
+    Generates the content for word/document.xml as a stream of XML fragments,
+    so the whole document never has to be held in memory at once.
+    """
+    yield DOCUMENT_XML_PREFIX
+
+    # Run/paragraph fragments go into a flat list that is joined and yielded
+    # (then cleared) after each paragraph or author
     body_parts = []
 
     # 1. Main Title
-    title_run = create_run_xml("Authors", bold=True)
-    body_parts.append(create_paragraph_xml([title_run]))
+    emit_paragraph_open(body_parts)
+    emit_run(body_parts, "Authors", bold=True)
+    emit_paragraph_close(body_parts)
+    yield "".join(body_parts)
+    body_parts.clear()
     
     # 2. Authors Block (Single paragraph, comma separated)
-    author_runs = []
-    total_authors = len(authors)
+    last_names, first_names, affil_strs = authors
+    total_authors = len(last_names)
     
-    for i, auth in enumerate(authors):
+    emit_paragraph_open(body_parts)
+    for i, (last, first, affils) in enumerate(zip(last_names, first_names, affil_strs)):
         # Name part (e.g., "Jane Doe")
-        full_name = f"{auth['first']} {auth['last']}".strip()
-        author_runs.append(create_run_xml(full_name))
+        full_name = f"{first} {last}".strip()
+        emit_run(body_parts, full_name)
         
-        # Affiliation part (Superscript, e.g., "1,2")
-        if auth['affils']:
-            author_runs.append(create_run_xml(auth['affils'], superscription=True))
+        # Affiliation part (Superscript, e.g., "1,2"), built inline as this is the hot path
+        if affils:
+            body_parts.append(f'<w:r>{SUP_PROPS}<w:t xml:space="preserve">{escape(affils)}</w:t></w:r>')
         
         # Comma separator (except for last author)
         if i < total_authors - 1:
-            author_runs.append(create_run_xml(", "))
-            
-    body_parts.append(create_paragraph_xml(author_runs))
+            body_parts.append(COMMA_RUN)
+
+        yield "".join(body_parts)
+        body_parts.clear()
+    emit_paragraph_close(body_parts)
     
     # 3. "Affiliations" Header
     # Add an empty line before text
-    body_parts.append(create_paragraph_xml([])) 
-    aff_header_run = create_run_xml("Affiliations", bold=True)
-    body_parts.append(create_paragraph_xml([aff_header_run]))
+    body_parts.append(EMPTY_PARA)
+    emit_paragraph_open(body_parts)
+    emit_run(body_parts, "Affiliations", bold=True)
+    emit_paragraph_close(body_parts)
+    yield "".join(body_parts)
+    body_parts.clear()
     
     # 4. Affiliations List (One paragraph per affiliation)
-    # Sort by ID (converting to int for correct numerical sorting)
-    sorted_ids = sorted(affiliations.keys(), key=lambda x: int(x) if x.isdigit() else x)
-    
-    for aff_id in sorted_ids:
+    # Sort by ID (IDs are ints, so this is a numerical sort)
+    for aff_id in sorted(affiliations):
         # Bold the ID number? The original text looked like "1Arizona..."
         # Usually it's nice to have "1 Arizona..." 
         # Based on previous input parsing, the ID was separate.
@@ -143,29 +184,63 @@ def generate_document_xml(authors, affiliations):
         # Run 1: The number (superscript or plain? Standard lists usually plain but let's stick to the input style)
         # Input style was "1Arizona State..." (often Superscript in Word doc, but plain text in extraction).
         # We will make the number Superscript to match the author markers visually.
-        id_run = create_run_xml(aff_id, superscription=True)
+        emit_paragraph_open(body_parts)
+        emit_run(body_parts, str(aff_id), superscription=True)
         
         # Run 2: The text
-        text_run = create_run_xml(f" {affiliations[aff_id]}")
-        
-        body_parts.append(create_paragraph_xml([id_run, text_run]))
+        emit_run(body_parts, f" {affiliations[aff_id]}")
+        emit_paragraph_close(body_parts)
 
-    return DOCUMENT_XML_TEMPLATE.format(body_content="".join(body_parts))
+        yield "".join(body_parts)
+        body_parts.clear()
 
-def write_docx(output_filename, document_xml_content):
-    """Writes the valid .docx zip structure."""
+    yield DOCUMENT_XML_SUFFIX
+
+def write_docx(output_filename, document_xml_chunks):
+    """
+    Writes the valid .docx zip structure.
+    The document XML is given as an iterable of string fragments, which are
+    batched up, then encoded and compressed as they arrive.
+    """
     try:
-        with zipfile.ZipFile(output_filename, 'w', zipfile.ZIP_DEFLATED) as zf:
-            # Add static required files
-            zf.writestr('[Content_Types].xml', CONTENT_TYPES_XML)
-            zf.writestr('_rels/.rels', RELS_XML)
+        with open(output_filename, 'wb', buffering=OUTPUT_BUFFER_SIZE) as f, \
+                zipfile.ZipFile(f, 'w', zipfile.ZIP_DEFLATED, compresslevel=DOCUMENT_COMPRESSLEVEL) as zf:
+            # Add static required files (tiny, so store them uncompressed)
+            zf.writestr('[Content_Types].xml', CONTENT_TYPES_XML, compress_type=zipfile.ZIP_STORED)
+            zf.writestr('_rels/.rels', RELS_XML, compress_type=zipfile.ZIP_STORED)
             
-            # Add the generated document content
-            zf.writestr('word/document.xml', document_xml_content)
+            # Stream the generated document content (fast deflate level)
+            with zf.open('word/document.xml', 'w') as doc:
+                pending = []
+                pending_size = 0
+                for chunk in document_xml_chunks:
+                    pending.append(chunk)
+                    pending_size += len(chunk)
+                    if pending_size >= DOCUMENT_WRITE_CHUNK_SIZE:
+                        doc.write("".join(pending).encode('utf-8'))
+                        pending.clear()
+                        pending_size = 0
+                if pending:
+                    doc.write("".join(pending).encode('utf-8'))
     except Exception as e:
         print(f"Error writing .docx file: {e}")
         sys.exit(1)
 
+def write(authors, affiliations, output_file):
+    """Generates the document XML for the given authors/affiliations and writes the .docx."""
+    print(f"Generating XML content and writing to {output_file}...")
+    write_docx(output_file, generate_document_xml(authors, affiliations))
+
+def run(names_file, affiliations_file, output_file):
+    """Converts names and affiliations CSV files into a .docx file."""
+    print("Reading CSV data...")
+    authors, affiliations = read_csv_data(names_file, affiliations_file)
+    print(f"Loaded {len(authors[0])} authors and {len(affiliations)} affiliations.")
+    
+    write(authors, affiliations, output_file)
+    
+    print("Done.")
+
 # ==========================================
 # MAIN EXECUTION
 # ==========================================
@@ -182,17 +257,7 @@ def main():
     
     args = parser.parse_args()
     
-    print("Reading CSV data...")
-    authors, affiliations = read_csv_data(args.names_file, args.affiliations_file)
-    print(f"Loaded {len(authors)} authors and {len(affiliations)} affiliations.")
-    
-    print("Generating XML content...")
-    doc_xml = generate_document_xml(authors, affiliations)
-    
-    print(f"Writing to {args.output_file}...")
-    write_docx(args.output_file, doc_xml)
-    
-    print("Done.")
+    run(args.names_file, args.affiliations_file, args.output_file)
 
 if __name__ == "__main__":
     main()
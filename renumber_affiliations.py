@@ -1,8 +1,18 @@
+import re
 import csv
 import argparse
 import sys
 import os
 
+# Output files are written through a large buffer to cut down on write() syscalls
+OUTPUT_BUFFER_SIZE = 1 << 20
+
+# Affiliation IDs within an author's comma-separated ID list
+_DIGIT_RE = re.compile(r'\d+')
+
+# A well-formed ID list holds nothing but digits, commas and whitespace
+_ID_LIST_RE = re.compile(r'[\d,\s]*')
+
 # ==========================================
 # PROCESSING LOGIC
 # ==========================================
@@ -10,73 +20,81 @@ import os
 def renumber_affiliations(names_data, affiliations_map):
     """
     Renumbers affiliations based on the order of appearance in names_data.
+    names_data is a (last_names, first_names, affil_strs) tuple of parallel
+    lists; affil_strs is updated in place with the new IDs.
     Returns:
-        new_affiliations_list: List of (new_id, text)
-        updated_names_data: List of author dicts with updated IDs
+        new_affiliations_list: List of (new_id (int), text)
+        updated_names_data: The names_data tuple with updated IDs
     """
     
     old_to_new_id_map = {}
+    missing_ids = set() # IDs (as written) already reported as missing
     new_affiliations_list = []
     current_new_id = 1
     
-    updated_names_data = []
+    last_names, _, affil_strs = names_data
 
     # Iterate through authors in the order they appear
-    for author in names_data:
-        original_ids_str = author['affils']
+    for i, affils in enumerate(affil_strs):
+        if _ID_LIST_RE.fullmatch(affils):
+            # Pull out the numeric IDs; this tolerates whitespace and
+            # stray commas such as "1, 2,"
+            original_ids = _DIGIT_RE.findall(affils)
+        else:
+            # Malformed list: split on commas only, so that tokens such as
+            # "2a" are reported below and kept as written rather than
+            # silently matched to a different affiliation
+            print(f"Warning: Author {last_names[i]} has a malformed affiliation ID list '{affils}'.")
+            original_ids = [x.strip() for x in affils.split(',') if x.strip()]
         
-        # Skip if author has no affiliations
-        if not original_ids_str.strip():
-            updated_names_data.append(author)
+        # Skip if author has no affiliations, clearing leftovers such as ","
+        if not original_ids:
+            affil_strs[i] = ""
             continue
-            
-        # Parse the comma-separated IDs
-        # We filter out empty strings to handle cases like "1, 2,"
-        original_ids = [x.strip() for x in original_ids_str.split(',') if x.strip()]
         
         new_ids_for_this_author = []
         
         for oid in original_ids:
+            key = int(oid) if oid.isdecimal() else oid
+            new_id = old_to_new_id_map.get(key)
+
             # If this affiliation ID hasn't been seen yet, assign a new number
-            if oid not in old_to_new_id_map:
+            if new_id is None:
                 # Check if the old ID actually exists in the affiliations file
-                if oid not in affiliations_map:
-                    print(f"Warning: Author {author['last']} references affiliation ID '{oid}', which is not in the affiliations file. Keeping original ID.")
-                    # Fallback: map to itself
-                    old_to_new_id_map[oid] = oid 
+                text = affiliations_map.get(key)
+                if text is None:
+                    if oid not in missing_ids:
+                        print(f"Warning: Author {last_names[i]} references affiliation ID '{oid}', which is not in the affiliations file. Keeping original ID.")
+                        missing_ids.add(oid)
+                    # Fallback: keep the ID exactly as written
+                    new_id = oid
                 else:
-                    # Assign new sequential ID
+                    # Assign new sequential ID and store the affiliation text with it
                     new_id = str(current_new_id)
-                    old_to_new_id_map[oid] = new_id
-                    
-                    # Store the affiliation text with its new ID
-                    new_affiliations_list.append((new_id, affiliations_map[oid]))
+                    new_affiliations_list.append((current_new_id, text))
                     current_new_id += 1
+                    old_to_new_id_map[key] = new_id
             
-            new_ids_for_this_author.append(old_to_new_id_map[oid])
+            new_ids_for_this_author.append(new_id)
             
-        # Update the author dictionary
-        updated_author = author.copy()
-        updated_author['affils'] = ",".join(new_ids_for_this_author)
-        updated_names_data.append(updated_author)
+        # Overwrite this author's IDs in place
+        affil_strs[i] = ",".join(new_ids_for_this_author)
 
     # Check for orphaned affiliations (affiliations in the file but never used by an author)
     # Append them to the end of the list with new IDs
     for oid, text in affiliations_map.items():
         if oid not in old_to_new_id_map:
-            new_id = str(current_new_id)
-            old_to_new_id_map[oid] = new_id
-            new_affiliations_list.append((new_id, text))
+            new_affiliations_list.append((current_new_id, text))
             current_new_id += 1
 
-    return new_affiliations_list, updated_names_data
+    return new_affiliations_list, names_data
 
 # ==========================================
 # FILE I/O
 # ==========================================
 
 def read_inputs(names_file, affiliations_file):
-    # Read Affiliations into a Dictionary
+    # Read Affiliations into a Dictionary keyed by integer ID
     aff_map = {}
     try:
         with open(affiliations_file, 'r', encoding='utf-8') as f:
@@ -85,49 +103,50 @@ def read_inputs(names_file, affiliations_file):
             for row in reader:
                 if len(row) >= 2:
                     # row[0] = ID, row[1] = Name
-                    aff_map[row[0].strip()] = row[1].strip()
+                    try:
+                        aff_id = int(row[0].strip())
+                    except ValueError:
+                        print(f"Error: Affiliations file '{affiliations_file}' contains a non-numeric ID: '{row[0]}'")
+                        sys.exit(1)
+                    aff_map[aff_id] = row[1].strip()
     except Exception as e:
         print(f"Error reading affiliations file: {e}")
         sys.exit(1)
 
-    # Read Names into a List
-    names_list = []
+    # Read Names into parallel lists (last, first, affiliation IDs)
+    last_names, first_names, affil_strs = [], [], []
     try:
         with open(names_file, 'r', encoding='utf-8') as f:
             reader = csv.reader(f)
             header = next(reader, None) # Skip header
             for row in reader:
                 if len(row) >= 3:
-                    names_list.append({
-                        'last': row[0].strip(),
-                        'first': row[1].strip(),
-                        'affils': row[2].strip()
-                    })
+                    last_names.append(row[0].strip())
+                    first_names.append(row[1].strip())
+                    affil_strs.append(row[2].strip())
     except Exception as e:
         print(f"Error reading names file: {e}")
         sys.exit(1)
         
-    return names_list, aff_map
+    return (last_names, first_names, affil_strs), aff_map
 
 def write_csvs(new_affils, updated_names, output_aff_name, output_names_name):
     # Write new Affiliations
     try:
-        with open(output_aff_name, 'w', newline='', encoding='utf-8') as f:
+        with open(output_aff_name, 'w', buffering=OUTPUT_BUFFER_SIZE, newline='', encoding='utf-8') as f:
             writer = csv.writer(f)
             writer.writerow(['Affiliation ID', 'Affiliation Name'])
-            for aff in new_affils:
-                writer.writerow(aff)
+            writer.writerows(new_affils)
         print(f"Successfully wrote: {output_aff_name}")
     except Exception as e:
         print(f"Error writing new affiliations file: {e}")
 
     # Write updated Names
     try:
-        with open(output_names_name, 'w', newline='', encoding='utf-8') as f:
+        with open(output_names_name, 'w', buffering=OUTPUT_BUFFER_SIZE, newline='', encoding='utf-8') as f:
             writer = csv.writer(f)
             writer.writerow(['Last Name', 'First Name / Middle', 'Affiliation IDs'])
-            for auth in updated_names:
-                writer.writerow([auth['last'], auth['first'], auth['affils']])
+            writer.writerows(zip(*updated_names))
         print(f"Successfully wrote: {output_names_name}")
     except Exception as e:
         print(f"Error writing updated names file: {e}")
@@ -138,6 +157,25 @@ def get_output_filename(input_path):
     new_filename = "reordered_" + filename
     return os.path.join(directory, new_filename)
 
+def run(names_input, affiliations_input):
+    """Renumbers the affiliations CSVs, writing 'reordered_' prefixed copies."""
+    # Generate output filenames dynamically
+    output_names = get_output_filename(names_input)
+    output_affiliations = get_output_filename(affiliations_input)
+    
+    # 1. Read Data
+    print(f"Reading input files: {names_input}, {affiliations_input}...")
+    names_data, aff_map = read_inputs(names_input, affiliations_input)
+    
+    # 2. Process
+    print("Renumbering...")
+    new_affils_list, updated_names = renumber_affiliations(names_data, aff_map)
+    
+    # 3. Write Data
+    write_csvs(new_affils_list, updated_names, output_affiliations, output_names)
+    
+    print("Done.")
+
 # ==========================================
 # MAIN
 # ==========================================
@@ -153,22 +191,7 @@ def main():
     
     args = parser.parse_args()
     
-    # Generate output filenames dynamically
-    output_names = get_output_filename(args.names_input)
-    output_affiliations = get_output_filename(args.affiliations_input)
-    
-    # 1. Read Data
-    print(f"Reading input files: {args.names_input}, {args.affiliations_input}...")
-    names_data, aff_map = read_inputs(args.names_input, args.affiliations_input)
-    
-    # 2. Process
-    print("Renumbering...")
-    new_affils_list, updated_names = renumber_affiliations(names_data, aff_map)
-    
-    # 3. Write Data
-    write_csvs(new_affils_list, updated_names, output_affiliations, output_names)
-    
-    print("Done.")
+    run(args.names_input, args.affiliations_input)
 
 if __name__ == "__main__":
     main()